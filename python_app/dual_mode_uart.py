@@ -7,13 +7,24 @@ import threading
 import time
 import calendar
 import logging
+import os
 import queue
 
+from telemetry_types import REC_OFFSET, REC_SYNC_ERROR, REC_SYNC_CMD
+
+try:
+    from telemetry_store import TelemetryStore
+except ImportError:
+    TelemetryStore = None
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 COM_PORT = 'COM11'
 BAUD_RATE = 9600
 
+BOARD_ID = 0
+TELEMETRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'telemetry')
+
 TYPE_SECOND = 0xB0
 TYPE_MINUTE = 0xB1
 TYPE_HOUR = 0xB2
@@ -23,6 +34,33 @@ TYPE_MONTH = 0xB4
 VALID_TYPES = {TYPE_SECOND, TYPE_MINUTE, TYPE_HOUR, TYPE_DAY, TYPE_MONTH}
 
 
+def get_clock_offset(now, month, day, hour, minute, second):
+    """Calculates the offset of a year-less clock time from the host clock.
+
+    The FPGA does not keep track of the year, so the year that puts the
+    time closest to `now` is used. This keeps the offset correct across
+    New Year.
+
+    Args:
+        now: The host time as a datetime.
+        month: The month of the clock time.
+        day: The day of the clock time.
+        hour: The hour of the clock time.
+        minute: The minute of the clock time.
+        second: The second of the clock time.
+
+    Returns:
+        The offset in seconds, or None if the date is invalid.
+    """
+    offsets = []
+    for year in (now.year - 1, now.year, now.year + 1):
+        try:
+            offsets.append((datetime(year, month, day, hour, minute, second) - now).total_seconds())
+        except ValueError:
+            continue
+    return min(offsets, key=abs) if offsets else None
+
+
 class FpgaClockApp:
     """A Tkinter application for monitoring and setting an FPGA-based clock.
 
@@ -52,6 +90,15 @@ class FpgaClockApp:
         self.running = True
         self.is_setting_mode = False
         self.serial_queue = queue.Queue()
+        self.received_types = set()
+        self.telemetry = None
+        if TelemetryStore is not None:
+            try:
+                self.telemetry = TelemetryStore(TELEMETRY_DIR)
+            except Exception as e:
+                logging.error(f"Error opening telemetry store, telemetry recording is disabled: {e}")
+        else:
+            logging.warning("NumPy is not installed, telemetry recording is disabled.")
 
         now = datetime.now()
         self.time_data = {
@@ -136,6 +183,7 @@ class FpgaClockApp:
             if COM_PORT not in ports:
                 raise serial.SerialException(f"Port {COM_PORT} not found. Available: {ports or 'None'}")
             self.ser = serial.Serial(COM_PORT, BAUD_RATE, timeout=0.01)
+            self.received_types.clear()
             self.is_serial_open = True
             self.status_str.set(f"Connected to {COM_PORT} @ {BAUD_RATE}")
             logging.info(f"Connected to {COM_PORT}")
@@ -169,12 +217,14 @@ class FpgaClockApp:
                         try:
                             self.serial_queue.put_nowait((type_byte, value_byte))
                             logging.info(f"DATA DECODED: Type={hex(type_byte)}, Value={value_byte}")
+                            self.record_telemetry(type_byte, value_byte)
                         except queue.Full:
                             logging.warning("Serial queue is full, dropping data.")
                     else:
                         logging.warning(
                             f"SYNC ERROR: Unknown TYPE byte {hex(type_byte)} received. Dropping first byte.")
                         BUFFER = BUFFER[1:]
+                        self.record_telemetry(REC_SYNC_ERROR, type_byte)
             except Exception as e:
                 if self.running:
                     logging.error(f"Serial read error: {e}")
@@ -194,7 +244,10 @@ class FpgaClockApp:
             try:
                 type_byte, value_byte = self.serial_queue.get_nowait()
                 self.time_data[type_byte] = value_byte
+                self.received_types.add(type_byte)
                 data_processed = True
+                if type_byte == TYPE_SECOND:
+                    self.record_clock_offset()
             except queue.Empty:
                 break
             except Exception as e:
@@ -204,6 +257,36 @@ class FpgaClockApp:
             self.update_display()
         self.master.after(50, self.check_serial_queue)
 
+    def record_telemetry(self, rec_type, value):
+        """Appends a record for this board to the telemetry store, if it is enabled.
+
+        Args:
+            rec_type: The record type (a UART TYPE byte or a telemetry REC_* constant).
+            value: The numeric value of the record.
+        """
+        if self.telemetry is None or not self.running:
+            return
+        try:
+            self.telemetry.append(BOARD_ID, rec_type, value)
+        except (OSError, ValueError) as e:
+            if self.running:
+                logging.error(f"Telemetry write error: {e}")
+
+    def record_clock_offset(self):
+        """Records the offset of the FPGA clock from the host clock in seconds.
+
+        The FPGA only sends a field when it changes, so nothing is recorded
+        until every field has been received since connecting. Until then,
+        `time_data` still holds host values for the other fields.
+        """
+        if self.telemetry is None or not VALID_TYPES <= self.received_types:
+            return
+        offset = get_clock_offset(datetime.now(), self.time_data[TYPE_MONTH], self.time_data[TYPE_DAY],
+                                  self.time_data[TYPE_HOUR], self.time_data[TYPE_MINUTE],
+                                  self.time_data[TYPE_SECOND])
+        if offset is not None:
+            self.record_telemetry(REC_OFFSET, offset)
+
     def create_main_monitor(self, frame):
         """Creates the main monitor frame with the time and date display.
 
@@ -569,12 +652,16 @@ class FpgaClockApp:
             messagebox.showerror("Serial Error", "Serial port is not open.")
             return
         data = [0xAA, month, day, hour, minute, second]
+        sent_offset = get_clock_offset(datetime.now(), month, day, hour, minute, second)
+        if sent_offset is None:
+            sent_offset = float('nan')
         month_name = self.get_month_name(month)
         status_time = f"{month_name} {day:02d} | {hour:02d}:{minute:02d}:{second:02d}"
         try:
             self.ser.write(bytes(data))
             self.status_str.set(f"Clock set: {status_time} sent to FPGA. Returning to monitor...")
             logging.info(f"Sent (Clock): {data}")
+            self.record_telemetry(REC_SYNC_CMD, sent_offset)
         except Exception as e:
             messagebox.showerror("Serial Error", f"Error sending data: {e}")
             self.status_str.set(f"Error sending data: {e}")
@@ -644,6 +731,8 @@ class FpgaClockApp:
         self.running = False
         if self.read_thread and self.read_thread.is_alive():
             self.read_thread.join(timeout=0.05)
+        if self.telemetry is not None:
+            self.telemetry.close()
         if self.is_serial_open:
             try:
                 self.ser.close()
@@ -0,0 +1,262 @@
+import os
+import re
+import struct
+import threading
+import time
+
+import numpy as np
+
+from telemetry_types import REC_OFFSET, REC_SYNC_ERROR, REC_SYNC_CMD
+
+# One record: timestamp (host seconds since epoch), board id, record type, value.
+RECORD_FORMAT = '<dHB5xd'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+RECORD_DTYPE = np.dtype({
+    'names': ['timestamp', 'board_id', 'type', 'value'],
+    'formats': ['<f8', '<u2', 'u1', '<f8'],
+    'offsets': [0, 8, 10, 16],
+    'itemsize': RECORD_SIZE,
+})
+
+# One index entry per full chunk: (min timestamp, max timestamp).
+INDEX_FORMAT = '<dd'
+INDEX_DTYPE = np.dtype([('t_min', '<f8'), ('t_max', '<f8')])
+
+SEGMENT_RECORDS = 1 << 20
+CHUNK_RECORDS = 4096
+
+DATA_SUFFIX = '.dat'
+INDEX_SUFFIX = '.idx'
+SEGMENT_NAME_RE = re.compile(r'seg_(\d{6})' + re.escape(DATA_SUFFIX))
+
+
+class TelemetryStore:
+    """An append-only, segmented store of fixed-width telemetry records.
+
+    Records are struct-packed into segment files of at most `segment_records`
+    entries. Every `chunk_records` records a (min, max) timestamp pair is
+    appended to the segment's index file, so range queries only touch the
+    chunks that can contain matching records. Queries read the segments
+    through memory-mapped NumPy views instead of loading them into memory.
+    """
+
+    def __init__(self, root_dir, segment_records=SEGMENT_RECORDS, chunk_records=CHUNK_RECORDS):
+        """Opens (or creates) a telemetry store.
+
+        Args:
+            root_dir: The directory holding the segment files.
+            segment_records: Maximum number of records per segment file.
+            chunk_records: Number of records covered by one time index entry.
+        """
+        if segment_records % chunk_records:
+            raise ValueError("segment_records must be a multiple of chunk_records.")
+        self.root_dir = root_dir
+        self.segment_records = segment_records
+        self.chunk_records = chunk_records
+        self.lock = threading.Lock()
+        os.makedirs(root_dir, exist_ok=True)
+
+        self.data_file = None
+        self.index_file = None
+        self.segment_id = -1
+        self.segment_count = 0
+        self.chunk_min = None
+        self.chunk_max = None
+
+        segment_ids = self._segment_ids() or [0]
+        for segment_id in segment_ids[:-1]:
+            self._repair_segment(segment_id)
+        self._open_segment(segment_ids[-1])
+
+    def _segment_path(self, segment_id, suffix):
+        """Returns the path of a segment's data or index file.
+
+        Args:
+            segment_id: The number of the segment.
+            suffix: DATA_SUFFIX or INDEX_SUFFIX.
+        """
+        return os.path.join(self.root_dir, f"seg_{segment_id:06d}{suffix}")
+
+    def _segment_ids(self):
+        """Returns the numbers of all segments in the store directory, in ascending order."""
+        matches = (SEGMENT_NAME_RE.fullmatch(name) for name in os.listdir(self.root_dir))
+        return sorted(int(m.group(1)) for m in matches if m)
+
+    def _repair_segment(self, segment_id):
+        """Drops a torn trailing record and rebuilds a stale time index after a crash.
+
+        Args:
+            segment_id: The number of the segment to check.
+
+        Returns:
+            The number of complete records in the segment.
+        """
+        data_path = self._segment_path(segment_id, DATA_SUFFIX)
+        index_path = self._segment_path(segment_id, INDEX_SUFFIX)
+
+        size = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+        count = size // RECORD_SIZE
+        if size != count * RECORD_SIZE:
+            with open(data_path, 'r+b') as f:
+                f.truncate(count * RECORD_SIZE)
+
+        full_chunks = count // self.chunk_records
+        index_size = os.path.getsize(index_path) if os.path.exists(index_path) else 0
+        if index_size != full_chunks * INDEX_DTYPE.itemsize:
+            index = self._build_index(data_path, full_chunks * self.chunk_records)
+            with open(index_path, 'wb') as f:
+                f.write(index.tobytes())
+        return count
+
+    def _open_segment(self, segment_id):
+        """Opens a segment for appending.
+
+        Args:
+            segment_id: The number of the segment to open.
+        """
+        data_path = self._segment_path(segment_id, DATA_SUFFIX)
+        count = self._repair_segment(segment_id)
+
+        self.chunk_min = None
+        self.chunk_max = None
+        tail_start = count - count % self.chunk_records
+        if tail_start < count:
+            records = np.memmap(data_path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+            tail = records['timestamp'][tail_start:]
+            self.chunk_min = float(tail.min())
+            self.chunk_max = float(tail.max())
+            del records
+
+        self.data_file = open(data_path, 'ab')
+        self.index_file = open(self._segment_path(segment_id, INDEX_SUFFIX), 'ab')
+        self.segment_id = segment_id
+        self.segment_count = count
+
+    def _build_index(self, data_path, count):
+        """Computes the chunk index for the first `count` records of a segment file."""
+        if count == 0:
+            return np.empty(0, dtype=INDEX_DTYPE)
+        records = np.memmap(data_path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+        timestamps = records['timestamp'].reshape(-1, self.chunk_records)
+        index = np.empty(len(timestamps), dtype=INDEX_DTYPE)
+        index['t_min'] = timestamps.min(axis=1)
+        index['t_max'] = timestamps.max(axis=1)
+        del records
+        return index
+
+    def _close_segment(self):
+        """Closes the data and index files of the active segment."""
+        for f in (self.data_file, self.index_file):
+            if f is not None:
+                f.close()
+        self.data_file = None
+        self.index_file = None
+
+    def append(self, board_id, rec_type, value, timestamp=None):
+        """Appends a single record to the store.
+
+        Args:
+            board_id: The board the record belongs to.
+            rec_type: The record type (a UART TYPE byte or one of the REC_* constants).
+            value: The numeric value of the record.
+            timestamp: Host time of the record in seconds since the epoch.
+                Defaults to the current time.
+
+        Raises:
+            ValueError: If a field does not fit the record format, or the store is closed.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        try:
+            record = struct.pack(RECORD_FORMAT, timestamp, board_id, rec_type, value)
+        except struct.error as e:
+            raise ValueError(f"Invalid telemetry record: {e}") from e
+        with self.lock:
+            if self.data_file is None:
+                raise ValueError("Telemetry store is closed.")
+            if self.segment_count >= self.segment_records:
+                self._close_segment()
+                self._open_segment(self.segment_id + 1)
+            self.data_file.write(record)
+            self.data_file.flush()
+            self.segment_count += 1
+
+            self.chunk_min = timestamp if self.chunk_min is None else min(self.chunk_min, timestamp)
+            self.chunk_max = timestamp if self.chunk_max is None else max(self.chunk_max, timestamp)
+            if self.segment_count % self.chunk_records == 0:
+                self.index_file.write(struct.pack(INDEX_FORMAT, self.chunk_min, self.chunk_max))
+                self.index_file.flush()
+                self.chunk_min = None
+                self.chunk_max = None
+
+    def query(self, t_start, t_end, board_id=None, rec_type=None):
+        """Returns all records with t_start <= timestamp <= t_end.
+
+        Only chunks whose time index overlaps the range are read, through a
+        memory-mapped view of each segment.
+
+        Args:
+            t_start: Start of the time range, in seconds since the epoch.
+            t_end: End of the time range, in seconds since the epoch.
+            board_id: If given, only return records of this board.
+            rec_type: If given, only return records of this type.
+
+        Returns:
+            A NumPy structured array of RECORD_DTYPE in storage order.
+        """
+        with self.lock:
+            active_id = self.segment_id
+            active_count = self.segment_count
+            tail_bounds = (self.chunk_min, self.chunk_max)
+
+        results = [np.empty(0, dtype=RECORD_DTYPE)]
+        for seg_id in self._segment_ids():
+            if seg_id > active_id:
+                continue
+            data_path = self._segment_path(seg_id, DATA_SUFFIX)
+            if seg_id == active_id:
+                count = active_count
+            else:
+                count = os.path.getsize(data_path) // RECORD_SIZE
+            if count == 0:
+                continue
+            full_chunks = count // self.chunk_records
+            index = np.fromfile(self._segment_path(seg_id, INDEX_SUFFIX), dtype=INDEX_DTYPE,
+                                count=full_chunks)
+            t_min = index['t_min']
+            t_max = index['t_max']
+            has_tail = count % self.chunk_records != 0
+            if has_tail:
+                if seg_id == active_id and tail_bounds[0] is not None:
+                    tail_min, tail_max = tail_bounds
+                else:
+                    tail_min, tail_max = -np.inf, np.inf
+                t_min = np.append(t_min, tail_min)
+                t_max = np.append(t_max, tail_max)
+
+            chunks = np.flatnonzero((t_min <= t_end) & (t_max >= t_start))
+            if chunks.size == 0:
+                continue
+
+            records = np.memmap(data_path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+            # Merge adjacent matching chunks into contiguous slices of the map.
+            breaks = np.flatnonzero(np.diff(chunks) != 1) + 1
+            for run in np.split(chunks, breaks):
+                start = int(run[0]) * self.chunk_records
+                stop = min((int(run[-1]) + 1) * self.chunk_records, count)
+                view = records[start:stop]
+                ts = view['timestamp']
+                mask = (ts >= t_start) & (ts <= t_end)
+                if board_id is not None:
+                    mask &= view['board_id'] == board_id
+                if rec_type is not None:
+                    mask &= view['type'] == rec_type
+                results.append(view[mask])
+            del records
+
+        return np.concatenate(results)
+
+    def close(self):
+        """Flushes and closes the active segment."""
+        with self.lock:
+            self._close_segment()
@@ -0,0 +1,5 @@
+# Telemetry record types, kept free of NumPy so the GUI can use them without telemetry support.
+# Decoded UART frames are stored under their own TYPE byte (0xB0-0xB4).
+REC_OFFSET = 0x01
+REC_SYNC_ERROR = 0x02
+REC_SYNC_CMD = 0xAA
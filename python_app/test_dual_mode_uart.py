@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("serial")
+pytest.importorskip("tkinter")
+
+from dual_mode_uart import get_clock_offset
+
+
+def test_same_year():
+    now = datetime(2025, 6, 15, 12, 0, 0)
+    assert get_clock_offset(now, 6, 15, 12, 0, 20) == 20
+    assert get_clock_offset(now, 6, 15, 11, 59, 50) == -10
+
+
+def test_fpga_in_new_year_while_host_in_december():
+    now = datetime(2025, 12, 31, 23, 59, 50)
+    assert get_clock_offset(now, 1, 1, 0, 0, 10) == 20
+
+
+def test_fpga_in_december_while_host_in_new_year():
+    now = datetime(2026, 1, 1, 0, 0, 10)
+    assert get_clock_offset(now, 12, 31, 23, 59, 50) == -20
+
+
+def test_feb_29_in_non_leap_year_uses_nearest_leap_year():
+    now = datetime(2025, 1, 10)
+    assert get_clock_offset(now, 2, 29, 0, 0, 0) == (datetime(2024, 2, 29) - now).total_seconds()
+    now = datetime(2027, 12, 20)
+    assert get_clock_offset(now, 2, 29, 0, 0, 0) == (datetime(2028, 2, 29) - now).total_seconds()
+
+
+def test_invalid_date_returns_none():
+    now = datetime(2025, 6, 15)
+    assert get_clock_offset(now, 2, 30, 0, 0, 0) is None
+    assert get_clock_offset(now, 13, 1, 0, 0, 0) is None
+    assert get_clock_offset(now, 6, 15, 24, 0, 0) is None
@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+import pytest
+
+from telemetry_store import (TelemetryStore, REC_OFFSET, REC_SYNC_ERROR, RECORD_SIZE, INDEX_DTYPE,
+                             DATA_SUFFIX, INDEX_SUFFIX)
+
+T0 = 1.7e9
+SEGMENT_RECORDS = 64
+CHUNK_RECORDS = 8
+
+
+def open_store(path):
+    return TelemetryStore(str(path), segment_records=SEGMENT_RECORDS, chunk_records=CHUNK_RECORDS)
+
+
+def fill(store, count):
+    for i in range(count):
+        store.append(i % 3, REC_OFFSET if i % 2 else REC_SYNC_ERROR, i * 0.5, T0 + i)
+
+
+def segment_file(path, segment_id, suffix):
+    return os.path.join(str(path), f"seg_{segment_id:06d}{suffix}")
+
+
+def test_rollover_creates_segments_with_full_indexes(tmp_path):
+    store = open_store(tmp_path)
+    fill(store, SEGMENT_RECORDS * 2 + 5)
+    store.close()
+
+    for segment_id, count in ((0, SEGMENT_RECORDS), (1, SEGMENT_RECORDS), (2, 5)):
+        assert os.path.getsize(segment_file(tmp_path, segment_id, DATA_SUFFIX)) == count * RECORD_SIZE
+        index = np.fromfile(segment_file(tmp_path, segment_id, INDEX_SUFFIX), dtype=INDEX_DTYPE)
+        assert len(index) == count // CHUNK_RECORDS
+        if len(index):
+            assert index['t_min'][0] == T0 + segment_id * SEGMENT_RECORDS
+            assert index['t_max'][0] == T0 + segment_id * SEGMENT_RECORDS + CHUNK_RECORDS - 1
+
+
+def test_query_spans_segments_and_active_tail(tmp_path):
+    store = open_store(tmp_path)
+    total = SEGMENT_RECORDS * 2 + 5
+    fill(store, total)
+
+    records = store.query(T0 + 10, T0 + total - 2)
+    assert list(records['timestamp'] - T0) == list(range(10, total - 1))
+    assert list(records['value']) == [i * 0.5 for i in range(10, total - 1)]
+
+    assert len(store.query(T0 - 100, T0 - 1)) == 0
+    assert len(store.query(T0 + total, T0 + total + 100)) == 0
+    store.close()
+
+
+def test_filter_by_board_and_type(tmp_path):
+    store = open_store(tmp_path)
+    fill(store, 150)
+
+    records = store.query(T0, T0 + 150, board_id=1, rec_type=REC_OFFSET)
+    expected = [i for i in range(150) if i % 3 == 1 and i % 2 == 1]
+    assert list(records['timestamp'] - T0) == expected
+    assert set(records['board_id']) == {1}
+    assert set(records['type']) == {REC_OFFSET}
+    store.close()
+
+
+def test_reopen_after_torn_write_and_stale_index(tmp_path):
+    store = open_store(tmp_path)
+    fill(store, SEGMENT_RECORDS + 20)
+    store.close()
+
+    with open(segment_file(tmp_path, 1, DATA_SUFFIX), 'ab') as f:
+        f.write(b'\x00' * (RECORD_SIZE // 2))
+    os.remove(segment_file(tmp_path, 0, INDEX_SUFFIX))
+    os.remove(segment_file(tmp_path, 1, INDEX_SUFFIX))
+
+    store = open_store(tmp_path)
+    assert os.path.getsize(segment_file(tmp_path, 1, DATA_SUFFIX)) == 20 * RECORD_SIZE
+    store.append(2, REC_OFFSET, -1.0, T0 + 1000)
+
+    records = store.query(T0, T0 + 2000)
+    assert list(records['timestamp'] - T0) == list(range(SEGMENT_RECORDS + 20)) + [1000]
+    assert records['value'][-1] == -1.0
+    store.close()
+
+
+def test_ignores_foreign_files(tmp_path):
+    (tmp_path / f"seg_old{DATA_SUFFIX}").write_bytes(b'')
+    store = open_store(tmp_path)
+    fill(store, 3)
+    assert len(store.query(T0, T0 + 3)) == 3
+    store.close()
+
+
+def test_invalid_record_raises_value_error(tmp_path):
+    store = open_store(tmp_path)
+    with pytest.raises(ValueError):
+        store.append(0, 300, 1.0)
+    store.close()
+    with pytest.raises(ValueError):
+        store.append(0, REC_OFFSET, 1.0)